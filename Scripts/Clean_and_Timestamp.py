@@ -1,8 +1,6 @@
 from pathlib import Path
 import pandas as pd
-import re, sys
-from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
+import os, re, sys
 
 '''
 USAGE: python/python3 .Clean_and_Timestamp.py <PATH_TO_RAW_DRONE_CSV>
@@ -21,23 +19,21 @@ PURPOSE OF THIS SCRIPT
 # format_time is a helper function to parse the start time string into a datetime object
 # df_filtered = the columns we have selected for this experiment
 
-def convert_UTC(row):
-
-    pst_time = row['Drone_Time(PST)']
-    format_data = "%Y-%m-%d %I:%M:%S.%f %p"
-
-    date = datetime.strptime(pst_time, format_data)
-    date_aware = date.replace(tzinfo=ZoneInfo("America/Los_Angeles"))
-    utc_time = date_aware.astimezone(timezone.utc)
-    rfc3339_utc = utc_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"  
-
-    return rfc3339_utc
-
 def format_time(df_filtered):
 
     # TimeStamp column is the final RFC3339 format
-    df_filtered['Drone_Time(PST)'] = df_filtered['CUSTOM.date [local]'] + ' ' + df_filtered['CUSTOM.updateTime [local]']
-    df_filtered['Drone_Time(UTC+RFC3339)'] = df_filtered.apply(convert_UTC, axis=1)
+    df_filtered['Drone_Time(PST)'] = df_filtered['CUSTOM.date [local]'].str.cat(df_filtered['CUSTOM.updateTime [local]'], sep=' ')
+
+    # Parse, localize and convert the whole column at once instead of row by row
+    format_data = "%Y-%m-%d %I:%M:%S.%f %p"
+    utc_time = pd.to_datetime(df_filtered['Drone_Time(PST)'], format=format_data)
+    # DST edge cases resolve the same way as datetime.replace(tzinfo=...): the repeated
+    # fall-back hour is taken as PDT and a skipped spring-forward time moves ahead one hour
+    utc_time = utc_time.dt.tz_localize("America/Los_Angeles", ambiguous=True, nonexistent=pd.Timedelta(hours=1)).dt.tz_convert("UTC")
+
+    # RFC3339 with milliseconds, e.g. 2023-11-01T17:57:48.910Z
+    milliseconds = (utc_time.dt.microsecond // 1000).astype(str).str.zfill(3)
+    df_filtered['Drone_Time(UTC+RFC3339)'] = utc_time.dt.strftime("%Y-%m-%dT%H:%M:%S.") + milliseconds + "Z"
 
     # Drop the columns we don't need
     df_filtered.drop('CUSTOM.date [local]', axis=1, inplace=True)
@@ -45,6 +41,10 @@ def format_time(df_filtered):
     return df_filtered
 
 
+def relevant_column(column):
+    # Columns that start with "CUSTOM" (CUSTOM includes the date) or "WEATHER"
+    return column.startswith('CUSTOM') or column.startswith('WEATHER')
+
 
 def main():
 
@@ -55,18 +55,23 @@ def main():
 
     csv_path_output = script_path.parent.parent / 'Data' / 'Cleaned' / f'CLEAN_{filename}'
 
-    # Read the CSV
-    df = pd.read_csv(filepath)
-
-    # Filter columns that start with "CUSTOM" (CUSTOM includes the date) or "WEATHER" 
-    relevant_cols = [c for c in df.columns if c.startswith('CUSTOM') or c.startswith('WEATHER')]
-
-    # Keep only those columns
-    df_filtered = df[relevant_cols]
-
-    formatted_time = format_time(df_filtered)
-    output = pd.DataFrame(formatted_time)
-    output.to_csv(csv_path_output, index=False)
+    # Read the CSV in chunks, keeping only the relevant columns while parsing,
+    # so a large flight log never has to fit in memory all at once
+    chunks = pd.read_csv(filepath, usecols=relevant_column, chunksize=200_000)
+
+    # Write to a temporary file and swap it in at the end, so a crash part way through
+    # never leaves a half-written CLEAN_ file behind
+    tmp_path_output = csv_path_output.with_suffix(csv_path_output.suffix + '.tmp')
+    try:
+        with open(tmp_path_output, 'w', newline='', encoding='utf-8') as out_file:
+            for i, df_filtered in enumerate(chunks):
+                formatted_time = format_time(df_filtered)
+                output = pd.DataFrame(formatted_time)
+                output.to_csv(out_file, header=(i == 0), index=False)
+    except BaseException:
+        tmp_path_output.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path_output, csv_path_output)
 
 
 
@@ -1,23 +1,10 @@
-from datetime import datetime
 import argparse
-import csv
+import shutil
 
-import test
+import pandas as pd
 
 
 
-def get_csv_file(file_path):
-    with open(file_path, "r") as csvfile:
-        filedata = csv.DictReader(csvfile) # reads the csv into a dictionary format
-
-        # Convert the filedata to a list of dictionaries to access the data after the file has been closed
-        data = []
-        for row in filedata:
-            data.append(row)
-            
-        return data
-
-
 def compare_time(DJI,ANE): #if DJI.time == ame.time: pass the speed and direction variables into the vector_math function.
     
     
@@ -30,35 +17,32 @@ def vector_math(v1,v2):
 
 
 
-class extra_needed_functions:
-    @staticmethod
-    def txt_to_csv(file_path):
-        with open(file_path, "r") as file: # opens the text file
-            data = file.readlines()
-            with open(file_path + ".csv", "w") as f:
-                f.writelines(data) # writes the text file data into a csv file for easier reading
-    
-    @staticmethod            
-    def parse_ame_line(text): #changes the datetime format to match the DJI drone data.
-        if '.' in text["ts"]: # check for milliseconds
-            dt = datetime.strptime(text["ts"], "%Y-%m-%dT%H:%M:%S.%fZ")
-        else:
-            dt = datetime.strptime(text["ts"], "%Y-%m-%dT%H:%M:%SZ")
-            
-        text["ts"] = dt.strftime("%Y-%m-%d:%H:%M:%S") # change the format to match the DJI time format
+def txt_to_csv(file_path):
+    # copies the text file into a csv file for easier reading, 1 MiB at a time instead of loading it all
+    with open(file_path, "rb") as src, open(file_path + ".csv", "wb") as dst:
+        shutil.copyfileobj(src, dst, length=1024 * 1024)
+
+def parse_ame_line(ts): #parses the whole ts column into datetimes comparable with the DJI drone data.
+    dt = pd.to_datetime(ts, format="ISO8601") # one vectorized pass, handles both with and without milliseconds
+    return dt.dt.tz_localize(None) # DJI TimeStamps carry no timezone
+
+def parse_dji_time(timestamp): #parses the DJI TimeStamp column ('2023-11-01:12:40:31') into datetimes.
+    return pd.to_datetime(timestamp, format="%Y-%m-%d:%H:%M:%S")
 
 
 def test(ame,dji):
-    matches = []
-    for ame_line in ame:
-        for dji_line in dji:
-            if ame_line["ts"] == dji_line["TimeStamp"]:
-                print("Match found:")
-                print("Anemometer:", ame_line)
-                print("DJI:", dji_line)
-                matches.append((ame_line, dji_line))
-        print("Completed checking ame line:", ame_line["ts"])
+    # DJI TimeStamps only have whole seconds, so pair every anemometer reading with every DJI record
+    # from the same second; inner join on the second, pandas builds the hash table and matches in C.
+    # NaT keys would match each other in a merge, so unparsed rows are dropped first
+    ame = ame.dropna(subset=["ts"])
+    dji = dji.dropna(subset=["TimeStamp"])
+    matches = ame.assign(second=ame["ts"].dt.floor("s")).merge(
+        dji, left_on="second", right_on="TimeStamp",
+    ).drop(columns="second")
+
+    print(f"Matches found: {len(matches)}")
     print(matches)
+    return matches
             
 def main():
     parser = argparse.ArgumentParser(description="Script for comparing the wind vectors from the DJI drone and a mounted anemometer.")
@@ -72,20 +56,21 @@ def main():
     # print(args.Anemometer)
     # print(args.DJI)
 
-    ame = get_csv_file(args.Anemometer)
-    dji = get_csv_file(args.DJI)
+    # Columnar reads: one numpy array per column instead of one dict per row
+    ame = pd.read_csv(args.Anemometer, usecols=['ts', 'U', 'V'], dtype={'U': 'float64', 'V': 'float64'})
+    dji = pd.read_csv(args.DJI, usecols=lambda c: c == 'TimeStamp' or c.startswith('WEATHER'))
 
-    print("ame:", ame[1]) # txt
-    print("dji:", dji[1]) # csv
+    print("ame:", ame.iloc[1]) # txt
+    print("dji:", dji.iloc[1]) # csv
     # test_functions(ame)
 
 
-    for line in ame:
-        extra_needed_functions.parse_ame_line(line)
+    ame['ts'] = parse_ame_line(ame['ts'])
+    dji['TimeStamp'] = parse_dji_time(dji['TimeStamp'])
         
     print()
-    print("ame after:", ame[1])
-    print("dji:", dji[1])
+    print("ame after:", ame.iloc[1])
+    print("dji:", dji.iloc[1])
     
     test(ame,dji)
     
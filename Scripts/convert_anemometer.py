@@ -34,32 +34,79 @@ raw_ts, ts, sn1, sn2, U, V, T, BatteryPct, BattV, BattC
 """
 import argparse # Handles command-line arguments
 import csv
+import re # Matches complete log lines in one pass
 from datetime import datetime, timezone # Builds datetimes
 from zoneinfo import ZoneInfo # Handles timezone convertion
 import sys
 
-def parse_line(line, assume_tz_name, keep_sn=True):
+import numpy as np
+import pandas as pd # Parses all timestamps of a file in one vectorized pass
+
+# A complete log line in the usual field order:
+#   TS SN### SN### U <u> V <v> T <t> Battery% <pct> BATTV <volts> BATTC <amps>
+LINE_RE = re.compile(
+    r"^(\S+)\s+SN(\d+)\s+SN(\d+)\s+U\s+(\S+)\s+V\s+(\S+)\s+T\s+(\S+)"
+    r"\s+Battery%\s+(\S+)\s+BATTV\s+(\S+)\s+BATTC\s+(\S+)\s*$"
+)
+
+# Raw timestamp YY:MM:DD:HH:MM:SS(.mmm)
+# Bounded ASCII digits, so a corrupt field can't overflow the numeric conversion
+TS_RE = re.compile(r"^([0-9]{1,4}):([0-9]{1,4}):([0-9]{1,4}):([0-9]{1,4}):([0-9]{1,4}):([0-9]{1,4})(?:\.([0-9]*))?$")
+
+def to_float(item):
+    """
+    Convert a value item to float, or "" if it cannot be parsed.
+    """
+    try:
+        # BatteryPct can be int-like; float covers both
+        return float(item)
+    except ValueError:
+        return ""
+
+def parse_line(line, assume_tz_name, keep_sn=True, parse_ts=True):
     """
     Parse one log line.
     Returns a dict with column names and values, or None if the line is empty/invalid.
+    With parse_ts=False the "ts" column is left empty so the caller can fill it in bulk
+    with parse_timestamps().
 
     We look for items in this order:
       - First item: timestamp (required)
       - Next two items (optional): SN codes like "SN150" "SN151"
       - Then key/value pairs: U, V, T, Battery%, BATTV, BATTC
+    Complete lines are matched with LINE_RE in one go; anything else (partial or
+    reordered lines) falls back to the item-by-item parser below.
     """
     # Clean and split the line
     line = line.strip()
     if not line:
         return None
 
+    # Fast path: the whole line in the usual format
+    match = LINE_RE.match(line)
+    if match:
+        raw_ts, sn1, sn2, U, V, T, BatteryPct, BattV, BattC = match.groups()
+        ts = parse_timestamp(raw_ts, assume_tz_name) if parse_ts else None
+        return {
+            "raw_ts": raw_ts,
+            "ts": ts if ts is not None else "",
+            "sn1": int(sn1) if keep_sn else "",
+            "sn2": int(sn2) if keep_sn else "",
+            "U": to_float(U),
+            "V": to_float(V),
+            "T": to_float(T),
+            "BatteryPct": to_float(BatteryPct),
+            "BattV": to_float(BattV),
+            "BattC": to_float(BattC),
+        }
+
     parts = line.split()
     if not parts:
         return None
 
     # 1) Timestamp (first item)
     raw_ts = parts[0]
-    ts = parse_timestamp(raw_ts, assume_tz_name)
+    ts = parse_timestamp(raw_ts, assume_tz_name) if parse_ts else None
 
     # Prepare the output row with defaults set to empty strings (Template for one row of the CSV)
     row = {
@@ -115,13 +162,7 @@ def parse_line(line, assume_tz_name, keep_sn=True):
         # If we have a current key, try to read this item as the corresponding value
         if current_key is not None:
             # Try to convert to float where it makes sense; if it fails, leave as empty
-            try:
-                # BatteryPct can be int-like; float covers both
-                value = float(item)
-            except ValueError:
-                value = ""  # could not parse; leave empty
-
-            row[current_key] = value
+            row[current_key] = to_float(item)
             current_key = None
             index += 1
             continue
@@ -172,38 +213,93 @@ def parse_timestamp(raw_ts, assume_tz_name):
         dt_local = dt_naive.replace(tzinfo=tz_local)
         dt_utc = dt_local.astimezone(timezone.utc)
 
-        # RFC3339 format. Include milliseconds only if we actually had them.
+        # RFC3339 format, built directly from the fields (no strftime format interpretation).
+        # Include milliseconds only if we actually had them.
+        text = (f"{dt_utc.year:04d}-{dt_utc.month:02d}-{dt_utc.day:02d}"
+                f"T{dt_utc.hour:02d}:{dt_utc.minute:02d}:{dt_utc.second:02d}")
         if micro:
             # Milliseconds are the first 3 digits of microseconds
-            ms = f"{dt_utc.microsecond // 1000:03d}"
-            return dt_utc.strftime(f"%Y-%m-%dT%H:%M:%S.{ms}Z")
+            return f"{text}.{dt_utc.microsecond // 1000:03d}Z"
         else:
-            return dt_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+            return f"{text}Z"
     except Exception:
         return None
 
-def convert_file(input_path, output_path, assume_tz_name, keep_sn=True):
-    rows = []
-    with open(input_path, "r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            parsed = parse_line(line, assume_tz_name, keep_sn=keep_sn)
-            if parsed is not None:
-                rows.append(parsed)
+def parse_timestamps(raw_ts, assume_tz_name):
+    """
+    Vectorized version of parse_timestamp() for a whole column of raw timestamps.
+    Returns a pandas Series of RFC3339 UTC strings ("" where parsing fails).
+    Each field must be 1-4 ASCII digits; the signs, spaces and longer fields int()
+    lets through in parse_timestamp() are not accepted here.
+    """
+    raw_ts = pd.Series(raw_ts, dtype=object).astype(str)
+
+    # Split into the same fields parse_timestamp() reads, so forms it accepts such as a
+    # trailing dot, a 1- or 3-digit year or zero-padded seconds parse here too
+    fields = raw_ts.str.extract(TS_RE)
+    numbers = fields.iloc[:, :6].apply(pd.to_numeric)
+    # Assembling from components would carry e.g. second 60 into the next minute; reject instead
+    numbers = numbers.mask((numbers[3] > 23) | (numbers[4] > 59) | (numbers[5] > 59))
+    # Milliseconds normalized to exactly 3 digits ('3' -> 300, '' -> 0)
+    ms = (fields[6].fillna("") + "000").str[:3].astype(int)
+    dt_local = pd.to_datetime(pd.DataFrame({
+        "year": 2000 + numbers[0], "month": numbers[1], "day": numbers[2],
+        "hour": numbers[3], "minute": numbers[4], "second": numbers[5], "ms": ms,
+    }), errors="coerce")
+
+    # Attach the assumed local timezone (e.g., America/Vancouver), then convert to UTC.
+    # DST edge cases resolve the same way as datetime.replace(tzinfo=...) in parse_timestamp().
+    dt_local = dt_local.dt.tz_localize(assume_tz_name, ambiguous=True, nonexistent=pd.Timedelta(hours=1))
+    dt_utc = dt_local.dt.tz_convert("UTC")
+
+    # RFC3339 format via NumPy's C formatter ('2023-11-02T00:39:22.316'); dt.strftime is per-element Python.
+    # Include milliseconds only if we actually had them.
+    values = dt_utc.dt.tz_localize(None).to_numpy().astype("datetime64[ms]")
+    text = pd.Series(np.datetime_as_string(values, unit="ms"), index=dt_utc.index)
+    text = text.where(dt_utc.dt.microsecond // 1000 > 0, text.str[:19]) + "Z"
+    return text.where(dt_utc.notna(), "")
+
+def write_rows(writer, rows, columns, assume_tz_name):
+    """
+    Fill in the timestamps of a batch of parsed rows in one pass and write them out.
+    """
+    timestamps = parse_timestamps([row["raw_ts"] for row in rows], assume_tz_name)
+    for row, ts in zip(rows, timestamps):
+        row["ts"] = ts
+        # Only keep requested columns, in header order
+        writer.writerow([row[col] for col in columns])
 
+def convert_file(input_path, output_path, assume_tz_name, keep_sn=True, batch_size=100_000):
     # Decide which columns to write
     columns = ["raw_ts", "ts", "U", "V", "T", "BatteryPct", "BattV", "BattC"]
     if keep_sn:
         # Insert sn1, sn2 after ts for readability
         columns = ["raw_ts", "ts", "sn1", "sn2", "U", "V", "T", "BatteryPct", "BattV", "BattC"]
 
-    with open(output_path, "w", newline="", encoding="utf-8") as out:
-        writer = csv.DictWriter(out, fieldnames=columns)
-        writer.writeheader()
-        for row in rows:
-            # Only keep requested columns
-            writer.writerow({col: row.get(col, "") for col in columns})
+    # Stream lines straight through to the output. Rows are only held long enough to
+    # convert their timestamps together, so memory stays bounded by batch_size.
+    count = 0
+    batch = []
+    with open(input_path, "r", encoding="utf-8", errors="ignore") as f, \
+         open(output_path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(columns)
+
+        for line in f:
+            parsed = parse_line(line, assume_tz_name, keep_sn=keep_sn, parse_ts=False)
+            if parsed is not None:
+                batch.append(parsed)
+                count += 1
+
+            if len(batch) >= batch_size:
+                write_rows(writer, batch, columns, assume_tz_name)
+                batch = []
+
+        # Write whatever is left in the last partial batch
+        if batch:
+            write_rows(writer, batch, columns, assume_tz_name)
 
-    print(f"Converted {len(rows)} lines.")
+    print(f"Converted {count} lines.")
     print(f"Input : {input_path}")
     print(f"Output: {output_path}")
     print(f"Timezone assumed: {assume_tz_name} -> converted to UTC (Z) in 'ts' column.")
@@ -27,7 +27,10 @@ What we do:
 
 Usage:
 ------
-python3 convert_anemometer_v2.py INPUT.txt OUTPUT.csv
+python3 convert_anemometer_v2.py INPUT.txt OUTPUT.csv [--workers N]
+
+With --workers N > 1 the file is split into newline-aligned byte ranges that are
+parsed in parallel processes and written back in their original order.
 
 Columns written:
 ----------------
@@ -36,19 +39,41 @@ raw_ts, ts, U, V, T, BatteryPct, BattV, BattC
 
 import argparse
 import csv
-from datetime import datetime, timezone
+import io
+import os
+import re
+from datetime import datetime
 from zoneinfo import ZoneInfo  # kept for consistency of format, not used for tz conversion
 import sys
+from multiprocessing import Pool
+
+# Output columns, in the order parse_line() returns them
+COLUMNS = ["raw_ts", "ts", "U", "V", "T", "BatteryPct", "BattV", "BattC"]
+
+# Raw timestamp YY:MM:DD:HH:MM:SS(.mmm), bounded ASCII digits so a corrupt field can't overflow datetime()
+TS_RE = re.compile(r"^([0-9]{1,4}):([0-9]{1,4}):([0-9]{1,4}):([0-9]{1,4}):([0-9]{1,4}):([0-9]{1,4})(?:\.([0-9]*))?$")
+
+def to_float(item):
+    """
+    Convert a value item to float, or "" if it cannot be parsed.
+    """
+    try:
+        # BatteryPct can be int-like; float covers both
+        return float(item)
+    except ValueError:
+        return ""
 
 def parse_line(line, assume_tz_name, keep_sn=True):
     """
     Parse one log line.
-    Returns a dict with column names and values, or None if the line is empty/invalid.
+    Returns a tuple of values in COLUMNS order, or None if the line is empty/invalid.
 
     We look for items in this order:
       - First item: timestamp (required)
       - Then key/value pairs: U, V, T, Battery%, BATTV, BATTC
     v2 change: SN items are ignored entirely.
+    Complete lines are read by position in one go; anything else (partial or
+    reordered lines) falls back to the item-by-item parser below.
     """
     # Clean and split the line
     line = line.strip()
@@ -59,6 +84,23 @@ def parse_line(line, assume_tz_name, keep_sn=True):
     if not parts:
         return None
 
+    # Fast path: the usual fixed layout
+    #   0:TS 1:SN 2:SN 3:U 4:<u> 5:V 6:<v> 7:T 8:<t> 9:Battery% 10:<pct> 11:BATTV 12:<volts> 13:BATTC 14:<amps>
+    if (len(parts) == 15 and parts[3] == "U" and parts[5] == "V" and parts[7] == "T"
+            and parts[9] == "Battery%" and parts[11] == "BATTV" and parts[13] == "BATTC"):
+        raw_ts = parts[0]
+        ts = parse_timestamp(raw_ts, assume_tz_name)
+        return (
+            raw_ts,
+            ts if ts is not None else "",
+            to_float(parts[4]),
+            to_float(parts[6]),
+            to_float(parts[8]),
+            to_float(parts[10]),
+            to_float(parts[12]),
+            to_float(parts[14]),
+        )
+
     # 1) Timestamp (first item)
     raw_ts = parts[0]
     ts = parse_timestamp(raw_ts, assume_tz_name)  # assume_tz_name is not used inside; kept for format consistency
@@ -99,13 +141,7 @@ def parse_line(line, assume_tz_name, keep_sn=True):
        # If we have a current key, try to read this item as the corresponding value
         if current_key is not None:
             # Try to convert to float where it makes sense; if it fails, leave as empty
-            try:
-                # BatteryPct can be int-like; float covers both
-                value = float(item)
-            except ValueError:
-                value = ""  # could not parse; leave empty
-
-            row[current_key] = value
+            row[current_key] = to_float(item)
             current_key = None
             index += 1
             continue
@@ -113,7 +149,7 @@ def parse_line(line, assume_tz_name, keep_sn=True):
         # If item is neither a key nor a value, we skip it
         index += 1
 
-    return row
+    return tuple(row[col] for col in COLUMNS)
 
 def parse_timestamp(raw_ts, assume_tz_name_unused):
     """
@@ -121,66 +157,99 @@ def parse_timestamp(raw_ts, assume_tz_name_unused):
     IMPORTANT (v2): raw_ts is already in UTC. We DO NOT convert timezones.
     
     Returns: RFC3339 'YYYY-MM-DDTHH:MM:SS(.mmm)Z' or None if parsing fails.
+    Each field must be 1-4 ASCII digits; signs, spaces and longer fields are rejected.
     """
-    try:
-        # Split by ":"
-        parts = raw_ts.split(":")
-        # Expected 6 parts: [YY, MM, DD, HH, MM, SS.mmm]
-        if len(parts) != 6:
-            return None
-
-        yy = int(parts[0])
-        MM = int(parts[1])
-        DD = int(parts[2])
-        HH = int(parts[3])
-        mm = int(parts[4])
-
-        # Seconds can have milliseconds like "22.316"
-        sec_part = parts[5]
-        if "." in sec_part:
-            sec_str, ms_str = sec_part.split(".", 1)
-            SS = int(sec_str)
-            # Normalize to exactly 3 digits of millisecond
-            ms_str = (ms_str + "000")[:3]
-            micro = int(ms_str) * 1000
-        else:
-            SS = int(sec_part)
-            micro = 0
+    # Expected 6 fields: YY:MM:DD:HH:MM:SS with optional .mmm
+    match = TS_RE.match(raw_ts)
+    if not match:
+        return None
 
-        # Turn 2-digit year into 2000-2099 range
-        YYYY = 2000 + yy
+    yy, MM, DD, HH, mm, SS, ms_str = match.groups()
+    YYYY = 2000 + int(yy)  # Turn 2-digit year into 2000-2099 range
+    MM, DD, HH, mm, SS = int(MM), int(DD), int(HH), int(mm), int(SS)
 
-        dt_utc = datetime(YYYY, MM, DD, HH, mm, SS, micro, tzinfo=timezone.utc)
+    # Normalize to exactly 3 digits of millisecond
+    ms = int((ms_str or "").ljust(3, "0")[:3])
 
-        # RFC3339 format. Include milliseconds only if we actually had them.
-        if micro:
-            # Milliseconds are the first 3 digits of microseconds
-            ms = f"{dt_utc.microsecond // 1000:03d}"
-            return dt_utc.strftime(f"%Y-%m-%dT%H:%M:%S.{ms}Z")
-        else:
-            return dt_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
-    except Exception:
+    # Only used to reject impossible dates/times (e.g. month 13); no tz conversion in v2
+    try:
+        datetime(YYYY, MM, DD, HH, mm, SS)
+    except (ValueError, OverflowError):
         return None
 
-def convert_file(input_path, output_path, assume_tz_name):
-    rows = []
-    with open(input_path, "r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            parsed = parse_line(line, assume_tz_name, keep_sn=False)
-            if parsed is not None:
-                rows.append(parsed)
+    # RFC3339 format. Include milliseconds only if we actually had them.
+    if ms:
+        return f"{YYYY:04d}-{MM:02d}-{DD:02d}T{HH:02d}:{mm:02d}:{SS:02d}.{ms:03d}Z"
+    else:
+        return f"{YYYY:04d}-{MM:02d}-{DD:02d}T{HH:02d}:{mm:02d}:{SS:02d}Z"
 
-    # Decide which columns to write
-    columns = ["raw_ts", "ts", "U", "V", "T", "BatteryPct", "BattV", "BattC"]
+def iter_rows(lines, assume_tz_name):
+    """
+    Yield the parsed row for every non-empty line, one at a time.
+    """
+    for line in lines:
+        parsed = parse_line(line, assume_tz_name, keep_sn=False)
+        if parsed is not None:
+            yield parsed
 
+def split_file(input_path, n_chunks):
+    """
+    Split a file into about n_chunks (start, end) byte ranges that each end right after a newline,
+    so no line (or multi-byte character) is cut in half.
+    """
+    size = os.path.getsize(input_path)
+    bounds = [0]
+    with open(input_path, "rb") as f:
+        for i in range(1, n_chunks):
+            f.seek(max(size * i // n_chunks, bounds[-1]))
+            f.readline()  # move to the start of the next line
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+def convert_chunk(task):
+    """
+    Worker: parse the lines in one byte range of the input.
+    Returns (csv_text, row_count) so the parent only has to write the text out in order.
+    """
+    input_path, start, end, assume_tz_name = task
+    with open(input_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # newline=None gives the same universal-newline splitting as reading the file in text mode
+    lines = io.StringIO(data.decode("utf-8", errors="ignore"), newline=None)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    count = 0
+    for row in iter_rows(lines, assume_tz_name):
+        writer.writerow(row)
+        count += 1
+    return out.getvalue(), count
+
+def convert_file(input_path, output_path, assume_tz_name, workers=1):
+    count = 0
     with open(output_path, "w", newline="", encoding="utf-8") as out:
-        writer = csv.DictWriter(out, fieldnames=columns)
-        writer.writeheader()
-        for row in rows:
-            # Only keep requested columns
-            writer.writerow({col: row.get(col, "") for col in columns})
+        writer = csv.writer(out)
+        writer.writerow(COLUMNS)
+
+        if workers > 1:
+            # Several chunks per worker keeps the processes busy if some ranges parse slower
+            tasks = [(input_path, start, end, assume_tz_name)
+                     for start, end in split_file(input_path, workers * 4)]
+            with Pool(workers) as pool:
+                # imap returns results in chunk order, so the output keeps the input line order
+                for text, chunk_count in pool.imap(convert_chunk, tasks):
+                    out.write(text)
+                    count += chunk_count
+        else:
+            # Stream rows straight from the input to the output; nothing is kept in memory
+            with open(input_path, "r", encoding="utf-8", errors="ignore", buffering=1024 * 1024) as f:
+                for row in iter_rows(f, assume_tz_name):
+                    writer.writerow(row)
+                    count += 1
 
-    print(f"Converted {len(rows)} lines. Timestamps formatted to RFC3339.")
+    print(f"Converted {count} lines. Timestamps formatted to RFC3339.")
     print(f"Input : {input_path}")
     print(f"Output: {output_path}")
 
@@ -195,9 +264,15 @@ def main():
         default="UTC",
         help="UNUSED in v2: timestamps are assumed to already be UTC. Kept for consistency.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes used to parse the file (default: 1)",
+    )
     args = parser.parse_args()
 
-    convert_file(args.input, args.output, args.assume_tz)
+    convert_file(args.input, args.output, args.assume_tz, workers=args.workers)
 
 if __name__ == "__main__":
     main()
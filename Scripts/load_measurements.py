@@ -13,7 +13,8 @@ That is done in convert_anemometer_v2.py
 
 Security:
 ---------
-All INSERT operations use parameterized SQL to prevent SQL injection.
+Rows are streamed to PostgreSQL with COPY ... FROM STDIN, so CSV values are
+never interpolated into SQL (no SQL injection).
 
 Required Python packages:
 -------------
@@ -41,26 +42,115 @@ Before running, make sure:
 - The CSV files are located in the same directory as this script
 """
 import csv
+import io
 import psycopg2
-import psycopg2.extras
 from colorama import Fore
 
 
-def empty_to_none(value):
+# CSV columns in the same order as the table columns they are copied into
+ANEMOMETER_COLUMNS = (
+    "ts", "raw_ts", "U", "V", "T", "BatteryPct", "BattV", "BattC", "VectorMag", "VectorDir",
+)
+DRONE_COLUMNS = (
+    "Drone_Time(UTC+RFC3339)",
+    "Drone_Time(PST)",
+    "CUSTOM.updateTime [local]",
+    "WEATHER.windDirection",
+    "WEATHER.windRelativeDirection",
+    "WEATHER.windSpeed [MPH]",
+    "WEATHER.maxWindSpeed [MPH]",
+    "WEATHER.windStrength",
+    "WEATHER.isFacingWind",
+    "WEATHER.isFlyingIntoWind",
+    "Drone_Direction_Deg",
+)
+
+
+def csv_rows(csv_file, columns):
     """
-    Convert an empty string to None so PostgreSQL stores it as NULL.
+    Yields the requested columns of every CSV row as a tuple, in the given order.
+    Column positions are looked up once from the header instead of building a dict per row.
+
+    Empty (or blank) values become None so PostgreSQL stores them as NULL.
     Example:
         "3.14"   → "3.14" (kept as-is)
         ""       → None   (becomes NULL in the DB)
+    Columns missing from the file are always None.
+    """
+    reader = csv.reader(csv_file)
+    header = next(reader, [])
+    positions = [header.index(col) if col in header else None for col in columns]
+    width = len(header)
+
+    for row in reader:
+        if not row:
+            continue  # skip blank lines, like csv.DictReader
+        if len(row) != width:
+            row = (row + [""] * width)[:width]  # short rows read as empty, extra fields are dropped
+        yield tuple(
+            None if i is None or not row[i] or row[i].isspace() else row[i]
+            for i in positions
+        )
+
+
+class CsvRowStream:
+    """
+    Minimal read-only file object for cursor.copy_expert().
+    Rows are pulled from an iterator and rendered as CSV text only when PostgreSQL
+    asks for the next chunk, so the whole file is never held in memory.
+    None values are written as unquoted empty fields, which COPY (FORMAT CSV) stores as NULL.
+    """
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator="\n")
+        self.row_count = 0
+
+    def read(self, size=-1):
+        # Render rows until there is enough text to hand back
+        while size < 0 or self.buffer.tell() < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.writer.writerow(row)
+            self.row_count += 1
+
+        data = self.buffer.getvalue()
+        if size < 0:
+            size = len(data)
+
+        # Keep whatever did not fit in this chunk for the next read()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.buffer.write(data[size:])
+        return data[:size]
+
+
+def copy_rows(connection, copy_sql, rows):
+    """
+    Streams rows (tuples in table column order) into PostgreSQL with a single COPY.
+    The whole file is one transaction: committed once at the end, rolled back on error.
+    Returns the number of rows sent.
+    """
+    stream = CsvRowStream(rows)
+    with connection:
+        with connection.cursor() as cur:
+            cur.copy_expert(copy_sql, stream)
+    return stream.row_count
+
+
+def print_progress(rows):
     """
-    if value is None:
-        return None
-    if isinstance(value, str) and value.strip() == "":
-        return None
-    return value
+    Passes rows through unchanged, printing progress every 5000 rows.
+    """
+    for processed_rows, row in enumerate(rows, start=1):
+        yield row
+        if processed_rows % 5000 == 0:
+            print(f"  {Fore.YELLOW}{processed_rows:,}{Fore.RESET} rows processed so far...")
 
 
-def load_anemometer_csv(connection, csv_path, batch_size=1000):
+def load_anemometer_csv(connection, csv_path):
     """
     Inserts data from CLEAN_ANEMOMETER.csv into the 'anemometer_measurements' table.
 
@@ -72,60 +162,19 @@ def load_anemometer_csv(connection, csv_path, batch_size=1000):
         - raw_ts is inserted unchanged for reference.
     """
 
-    insert_sql = """
-        INSERT INTO public.anemometer_measurements
+    copy_sql = """
+        COPY public.anemometer_measurements
             (ts_utc, raw_ts, u, v, temperature_c, battery_pct, batt_v, batt_c, vector_mag, vector_dir_deg)
-        VALUES
-            (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
-
-    batch = []
-    processed_rows = 0
-
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-
-        for row in reader:
-            processed_rows += 1 # Counts each processed row
-
-            params = (
-                empty_to_none(row.get("ts")),          # Data integrity check on all parameters
-                empty_to_none(row.get("raw_ts")),      
-                empty_to_none(row.get("U")),
-                empty_to_none(row.get("V")),
-                empty_to_none(row.get("T")),
-                empty_to_none(row.get("BatteryPct")),
-                empty_to_none(row.get("BattV")),
-                empty_to_none(row.get("BattC")),
-                empty_to_none(row.get("VectorMag")),
-                empty_to_none(row.get("VectorDir")),
-            )
-
-            batch.append(params)
-
-            # Write in batches for speed. 1,000 row batches
-            if len(batch) >= batch_size:
-                with connection.cursor() as cur:
-                    # Arguments needed for .execute_batch are: 
-                    # cursor, SQL statement, List (or iterable)
-                    psycopg2.extras.execute_batch(cur, insert_sql, batch)
-                connection.commit()
-                batch = []
-
-            # Prints progress every 5000 rows
-            if processed_rows % 5000 == 0:
-                print(f"  {Fore.YELLOW}{processed_rows:,}{Fore.RESET} rows processed so far...")
-
-    # Insert any records that didn't reach 1,000
-    # ex. From 1,200 records. 200 would be inserted here
-    if batch:
-        with connection.cursor() as cur:
-            psycopg2.extras.execute_batch(cur, insert_sql, batch)
-        connection.commit()
+        FROM STDIN WITH (FORMAT CSV)
+    """
+
+    with open(csv_path, "r", encoding="utf-8", buffering=1024 * 1024) as f:  # 1 MiB reads instead of 8 KiB
+        # One COPY for the whole file: no per-row statement binding or round trips
+        processed_rows = copy_rows(connection, copy_sql, print_progress(csv_rows(f, ANEMOMETER_COLUMNS)))
 
     print(f"  Finished Anemometer Insert ({Fore.YELLOW}{processed_rows:,}{Fore.RESET} rows total)")
 
-def load_drone_csv(connection, csv_path, batch_size=1000):
+def load_drone_csv(connection, csv_path):
     """
     Inserts data from CLEAN_COMBINED.csv into the drone_measurements table.
 
@@ -148,55 +197,18 @@ def load_drone_csv(connection, csv_path, batch_size=1000):
         - Numeric columns store NULL instead of "" when missing.
     """
 
-    insert_sql = """
-        INSERT INTO public.drone_measurements
+    copy_sql = """
+        COPY public.drone_measurements
             (drone_time_utc, drone_time_pst, update_time_local_raw,
              wind_direction, wind_relative_direction,
              wind_speed_mph, max_wind_speed_mph,
              wind_strength, is_facing_wind, is_flying_into_wind,
              drone_direction_deg)
-        VALUES
-            (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
-
-    batch = []
-    processed_rows = 0
-
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-
-        for row in reader:
-            processed_rows += 1
-
-            params = (
-                empty_to_none(row.get("Drone_Time(UTC+RFC3339)")),
-                empty_to_none(row.get("Drone_Time(PST)")),
-                empty_to_none(row.get("CUSTOM.updateTime [local]")),
-                empty_to_none(row.get("WEATHER.windDirection")),
-                empty_to_none(row.get("WEATHER.windRelativeDirection")),
-                empty_to_none(row.get("WEATHER.windSpeed [MPH]")),
-                empty_to_none(row.get("WEATHER.maxWindSpeed [MPH]")),
-                empty_to_none(row.get("WEATHER.windStrength")),
-                empty_to_none(row.get("WEATHER.isFacingWind")),
-                empty_to_none(row.get("WEATHER.isFlyingIntoWind")),
-                empty_to_none(row.get("Drone_Direction_Deg")),
-            )
-
-            batch.append(params)
-
-            if len(batch) >= batch_size:
-                with connection.cursor() as cursor:
-                    psycopg2.extras.execute_batch(cursor, insert_sql, batch)
-                connection.commit()
-                batch = []
-
-            if processed_rows % 5000 == 0:
-                print(f"  {Fore.YELLOW}{processed_rows:,}{Fore.RESET} rows processed so far...")
-
-    if batch:
-        with connection.cursor() as cursor:
-            psycopg2.extras.execute_batch(cursor, insert_sql, batch)
-        connection.commit()
+        FROM STDIN WITH (FORMAT CSV)
+    """
+
+    with open(csv_path, "r", encoding="utf-8", buffering=1024 * 1024) as f:  # 1 MiB reads instead of 8 KiB
+        processed_rows = copy_rows(connection, copy_sql, print_progress(csv_rows(f, DRONE_COLUMNS)))
 
     print(f"  Finished Drone Insert ({Fore.YELLOW}{processed_rows:,}{Fore.RESET} rows total)")
 